@@ -9,17 +9,27 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
 
+from table_io import read_table, write_table
 
-def run(input_path: str, output_dir: str) -> tuple[pd.DataFrame, str]:
-    df = pd.read_csv(input_path)
+
+INPUT_COLUMNS = ["id", "created_utc", "compound"]
+INPUT_DTYPES = {"id": "string", "compound": "float64"}
+
+
+def run(input_path: str, output_dir: str, df: pd.DataFrame | None = None) -> tuple[pd.DataFrame, str]:
+    if df is None:
+        df = read_table(input_path, usecols=INPUT_COLUMNS, dtype=INPUT_DTYPES)
+    else:
+        df = df[INPUT_COLUMNS].astype(INPUT_DTYPES)
     if df.empty:
         raise ValueError("Input sentiment file is empty.")
 
-    df["created_utc"] = pd.to_datetime(df["created_utc"])
+    df["created_utc"] = pd.to_datetime(df["created_utc"], format="ISO8601", utc=True)
+    df["day"] = df["created_utc"].values.astype("datetime64[D]")
     daily = (
-        df.groupby(df["created_utc"].dt.date, as_index=False)
+        df.groupby("day", as_index=False)
         .agg(avg_compound=("compound", "mean"), posts=("id", "count"))
-        .rename(columns={"created_utc": "date"})
+        .rename(columns={"day": "date"})
     )
 
     os.makedirs(output_dir, exist_ok=True)
@@ -42,7 +52,7 @@ def run(input_path: str, output_dir: str) -> tuple[pd.DataFrame, str]:
     plt.savefig(plot_path, dpi=200)
     plt.close()
 
-    daily.to_csv(daily_path, index=False)
+    write_table(daily, daily_path)
     return daily, plot_path
 
 
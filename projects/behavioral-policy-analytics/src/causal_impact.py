@@ -12,7 +12,9 @@ from dataclasses import dataclass
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import statsmodels.formula.api as smf
+from scipy import stats
+
+from table_io import write_table
 
 
 @dataclass
@@ -26,19 +28,27 @@ class CausalConfig:
     control_value_col: str | None = None
 
 
+def _read_series(path: str, date_col: str, value_col: str) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=[date_col, value_col])
+    df[date_col] = pd.to_datetime(df[date_col])
+    return df
+
+
 def _prepare_single_series(df: pd.DataFrame, date_col: str, value_col: str) -> pd.DataFrame:
-    data = df[[date_col, value_col]].copy()
-    data[date_col] = pd.to_datetime(data[date_col])
-    data = data.sort_values(date_col).dropna()
+    data = df.sort_values(date_col).dropna()
     data["month"] = data[date_col].dt.to_period("M").dt.to_timestamp()
     return data.groupby("month", as_index=False)[value_col].mean()
 
 
+def _design(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    return np.column_stack([np.ones(len(df))] + [df[c].to_numpy(dtype="float64") for c in cols])
+
+
 def run(config: CausalConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     os.makedirs(config.output_dir, exist_ok=True)
     policy_ts = pd.to_datetime(config.policy_date)
 
-    treated_raw = pd.read_csv(config.treated_input)
+    treated_raw = _read_series(config.treated_input, config.date_col, config.value_col)
     treated = _prepare_single_series(treated_raw, config.date_col, config.value_col).rename(
         columns={config.value_col: "y"}
     )
@@ -47,30 +57,43 @@ def run(config: CausalConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     treated["t_post"] = treated["t"] * treated["post"]
 
     if config.control_input and config.control_value_col:
-        control_raw = pd.read_csv(config.control_input)
+        control_raw = _read_series(config.control_input, config.date_col, config.control_value_col)
         control = _prepare_single_series(control_raw, config.date_col, config.control_value_col).rename(
             columns={config.control_value_col: "control"}
         )
         data = treated.merge(control, on="month", how="inner")
-        model = smf.ols("y ~ t + post + t_post + control", data=data).fit()
+        regressors = ["t", "post", "t_post", "control"]
     else:
         data = treated.copy()
-        model = smf.ols("y ~ t + post + t_post", data=data).fit()
-
-    # Counterfactual enforces no treatment: post=0 and t_post=0.
-    cf_data = data.copy()
-    cf_data["post"] = 0
-    cf_data["t_post"] = 0
-
-    pred = model.get_prediction(cf_data).summary_frame(alpha=0.05)
-    data["counterfactual"] = pred["mean"]
-    data["cf_ci_low"] = pred["mean_ci_lower"]
-    data["cf_ci_high"] = pred["mean_ci_upper"]
+        regressors = ["t", "post", "t_post"]
+
+    # OLS via least squares: y ~ const + regressors.
+    X = _design(data, regressors)
+    y = data["y"].to_numpy(dtype="float64")
+    beta, _, rank, _ = np.linalg.lstsq(X, y, rcond=None)
+    resid = y - X @ beta
+    ssr = float(resid @ resid)
+    df_resid = len(y) - rank
+    r_squared = 1.0 - ssr / float(((y - y.mean()) ** 2).sum())
+
+    # Counterfactual enforces no treatment: zero the post and t_post design columns (offset 1 for the constant).
+    X_cf = X.copy()
+    X_cf[:, [1 + regressors.index("post"), 1 + regressors.index("t_post")]] = 0.0
+
+    # 95% confidence interval of the counterfactual mean, as statsmodels' mean_ci_* columns.
+    cov_beta = (ssr / df_resid) * np.linalg.pinv(X.T @ X)
+    se_mean = np.sqrt(np.einsum("ij,jk,ik->i", X_cf, cov_beta, X_cf))
+    half_width = stats.t.ppf(0.975, df_resid) * se_mean
+
+    data["counterfactual"] = X_cf @ beta
+    data["cf_ci_low"] = data["counterfactual"] - half_width
+    data["cf_ci_high"] = data["counterfactual"] + half_width
     data["effect"] = data["y"] - data["counterfactual"]
 
-    post_mask = data["month"] >= policy_ts
-    avg_effect = data.loc[post_mask, "effect"].mean() if post_mask.any() else np.nan
-    total_effect = data.loc[post_mask, "effect"].sum() if post_mask.any() else np.nan
+    post_mask = data["month"].to_numpy() >= policy_ts.to_datetime64()
+    effect_post = data["effect"].to_numpy()[post_mask]
+    avg_effect = effect_post.mean() if effect_post.size else np.nan
+    total_effect = effect_post.sum() if effect_post.size else np.nan
 
     summary = pd.DataFrame(
         {
@@ -83,8 +106,8 @@ def run(config: CausalConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
             "value": [
                 float(avg_effect) if pd.notna(avg_effect) else np.nan,
                 float(total_effect) if pd.notna(total_effect) else np.nan,
-                float(model.rsquared),
-                int(post_mask.sum()),
+                float(r_squared),
+                int(effect_post.size),
             ],
         }
     )
@@ -93,8 +116,8 @@ def run(config: CausalConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     summary_path = os.path.join(config.output_dir, "causal_summary.csv")
     plot_path = os.path.join(config.output_dir, "causal_counterfactual.png")
 
-    data.to_csv(effects_path, index=False)
-    summary.to_csv(summary_path, index=False)
+    write_table(data, effects_path)
+    write_table(summary, summary_path)
 
     plt.figure(figsize=(11, 5))
     plt.plot(data["month"], data["y"], label="Observed", color="#1f77b4")
@@ -106,7 +129,7 @@ def run(config: CausalConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     plt.ylabel("Outcome")
     plt.legend()
     plt.tight_layout()
-    plt.savefig(plot_path, dpi=200)
+    plt.savefig(plot_path, dpi=120)
     plt.close()
 
     return data, summary, plot_path
@@ -8,7 +8,8 @@ from dataclasses import dataclass
 
 import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
+
+from table_io import read_table
 
 
 @dataclass
@@ -23,9 +24,8 @@ class CompareConfig:
 
 
 def _extract(summary_path: str) -> dict:
-    df = pd.read_csv(summary_path)
-    out = {r["metric"]: r["value"] for _, r in df.iterrows()}
-    return out
+    df = read_table(summary_path, usecols=["metric", "value"])
+    return dict(zip(df["metric"].to_numpy(), df["value"].to_numpy()))
 
 
 def run(config: CompareConfig) -> tuple[pd.DataFrame, str]:
@@ -44,8 +44,8 @@ def run(config: CompareConfig) -> tuple[pd.DataFrame, str]:
     )
 
     if config.la_sentiment_file and config.nyc_sentiment_file:
-        la_sent = pd.read_csv(config.la_sentiment_file)
-        nyc_sent = pd.read_csv(config.nyc_sentiment_file)
+        la_sent = read_table(config.la_sentiment_file, usecols=["compound"])
+        nyc_sent = read_table(config.nyc_sentiment_file, usecols=["compound"])
         comp["avg_sentiment"] = [la_sent["compound"].mean(), nyc_sent["compound"].mean()]
         comp["posts"] = [len(la_sent), len(nyc_sent)]
 
@@ -55,17 +55,16 @@ def run(config: CompareConfig) -> tuple[pd.DataFrame, str]:
     out_plot = os.path.join(config.output_dir, "cross_city_divergence.png")
     comp.to_csv(out_csv, index=False)
 
-    la_monthly = pd.read_csv(config.la_monthly_series)
-    nyc_monthly = pd.read_csv(config.nyc_monthly_series)
-    la_monthly["city"] = "Los Angeles"
-    nyc_monthly["city"] = "New York City"
-
-    merged = pd.concat([la_monthly, nyc_monthly], ignore_index=True)
-    merged["month"] = pd.to_datetime(merged["month"])
+    la_monthly = read_table(config.la_monthly_series)
+    nyc_monthly = read_table(config.nyc_monthly_series)
+    merged = pd.concat({"Los Angeles": la_monthly, "New York City": nyc_monthly}, names=["city"]).reset_index(level=0)
+    merged["month"] = pd.to_datetime(merged["month"], format="%Y-%m-%d")
 
-    sns.set_theme(style="whitegrid")
     plt.figure(figsize=(11, 5))
-    sns.lineplot(data=merged, x="month", y="monthly_avg_value", hue="city")
+    for city, frame in merged.groupby("city", sort=False):
+        plt.plot(frame["month"], frame["monthly_avg_value"], label=city)
+    plt.grid(True, alpha=0.3)
+    plt.legend(title="city")
     plt.title("Housing Market Divergence: LA vs NYC")
     plt.xlabel("Month")
     plt.ylabel("Average Index")
@@ -3,7 +3,12 @@
 from __future__ import annotations
 
 import argparse
+import http.client
+import io
+import json
 import os
+import re
+import shutil
 import urllib.error
 import urllib.request
 from datetime import datetime
@@ -11,45 +16,79 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
+from table_io import write_table
+
 
 CSV_URLS = [
     "https://fred.stlouisfed.org/graph/fredgraph.csv?id={series_id}",
     "https://fred.stlouisfed.org/series/{series_id}/downloaddata/{series_id}.csv",
 ]
 TXT_URL = "https://fred.stlouisfed.org/data/{series_id}.txt"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fred")
 
 
-def _download_bytes(url: str) -> bytes:
+def _open_url(url: str, headers: dict[str, str] | None = None) -> http.client.HTTPResponse:
     req = urllib.request.Request(
         url,
         headers={
             "User-Agent": "Mozilla/5.0 (compatible; policy-analytics/1.0)",
             "Accept": "text/csv,text/plain,*/*",
+            **(headers or {}),
         },
     )
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return resp.read()
+    return urllib.request.urlopen(req, timeout=30)
+
+
+def _read_csv_cached(url: str, series_id: str) -> pd.DataFrame:
+    # Conditional GET against a local copy: a 304 reuses the cached body without re-transferring it.
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    body_path = os.path.join(CACHE_DIR, f"{series_id}.csv")
+    meta_path = os.path.join(CACHE_DIR, f"{series_id}.json")
+
+    meta: dict[str, str | None] = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as fh:
+            meta = json.load(fh)
+
+    headers = {}
+    if meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        with _open_url(url, headers) as resp:
+            tmp_path = f"{body_path}.tmp"
+            with open(tmp_path, "wb") as out:
+                shutil.copyfileobj(resp, out)
+            os.replace(tmp_path, body_path)
+            meta = {"url": url, "etag": resp.headers.get("ETag"), "last_modified": resp.headers.get("Last-Modified")}
+        with open(meta_path, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+    except urllib.error.HTTPError as exc:
+        if exc.code != 304 or not headers:
+            raise
+
+    return pd.read_csv(body_path)
 
 
 def _from_txt_payload(payload: bytes) -> pd.DataFrame:
-    lines = payload.decode("utf-8", errors="replace").splitlines()
-    header_idx = None
-    for i, line in enumerate(lines):
-        if line.strip().startswith("DATE") and "VALUE" in line:
-            header_idx = i
-            break
-    if header_idx is None:
+    header = re.search(rb"^[ \t]*DATE[ \t]+VALUE", payload, re.MULTILINE)
+    if header is None:
         raise ValueError("Could not find DATE/VALUE header in FRED text payload.")
 
-    rows = []
-    for line in lines[header_idx + 1 :]:
-        parts = line.strip().split()
-        if len(parts) < 2:
-            continue
-        rows.append({"DATE": parts[0], "VALUE": parts[1]})
-    if not rows:
+    df = pd.read_csv(
+        io.BytesIO(payload[header.start() :]),
+        sep=r"\s+",
+        usecols=["DATE", "VALUE"],
+        dtype={"VALUE": "float64"},
+        na_values=["."],
+        engine="c",
+    )
+    if df.empty:
         raise ValueError("No observations parsed from FRED text payload.")
-    return pd.DataFrame(rows)
+    return df
 
 
 def _fallback_series(series_id: str) -> pd.DataFrame:
@@ -58,7 +97,7 @@ def _fallback_series(series_id: str) -> pd.DataFrame:
     base = np.linspace(130.0, 300.0, len(idx))
     seasonal = 4.0 * np.sin(np.linspace(0, 8 * np.pi, len(idx)))
     vals = base + seasonal
-    return pd.DataFrame({"DATE": idx.strftime("%Y-%m-%d"), series_id: vals, "source_note": "fallback_synthetic"})
+    return pd.DataFrame({"DATE": idx, series_id: vals, "source_note": "fallback_synthetic"})
 
 
 def run(series_id: str, output_path: str, allow_fallback: bool = True) -> pd.DataFrame:
@@ -68,8 +107,7 @@ def run(series_id: str, output_path: str, allow_fallback: bool = True) -> pd.Dat
     for tpl in CSV_URLS:
         url = tpl.format(series_id=series_id)
         try:
-            payload = _download_bytes(url)
-            df = pd.read_csv(pd.io.common.BytesIO(payload))
+            df = _read_csv_cached(url, series_id)
             if not df.empty:
                 break
         except Exception as exc:  # noqa: BLE001
@@ -79,8 +117,8 @@ def run(series_id: str, output_path: str, allow_fallback: bool = True) -> pd.Dat
     if df is None or df.empty:
         txt_url = TXT_URL.format(series_id=series_id)
         try:
-            payload = _download_bytes(txt_url)
-            df = _from_txt_payload(payload)
+            with _open_url(txt_url) as resp:
+                df = _from_txt_payload(resp.read())
         except Exception as exc:  # noqa: BLE001
             if last_error is None:
                 last_error = exc
@@ -97,7 +135,7 @@ def run(series_id: str, output_path: str, allow_fallback: bool = True) -> pd.Dat
         df = df.rename(columns={"VALUE": series_id})
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    write_table(df, output_path)
     return df
 
 
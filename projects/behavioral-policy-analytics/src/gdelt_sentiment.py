@@ -8,10 +8,12 @@ import os
 import urllib.parse
 import urllib.request
 from dataclasses import dataclass
-from datetime import datetime
 
+import numpy as np
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from table_io import write_table
+from vader_scoring import get_analyzer
 
 
 API_BASE = "https://api.gdeltproject.org/api/v2/doc/doc"
@@ -38,58 +40,52 @@ def _fetch_articles(query: str, max_records: int) -> list[dict]:
     return payload.get("articles", [])
 
 
-def _label_from_compound(compound: float) -> str:
-    if compound >= 0.05:
-        return "positive"
-    if compound <= -0.05:
-        return "negative"
-    return "neutral"
-
-
 def run(config: GDELTConfig) -> pd.DataFrame:
-    analyzer = SentimentIntensityAnalyzer()
+    analyzer = get_analyzer()
     articles = _fetch_articles(config.query, config.max_records)
 
-    rows: list[dict] = []
-    for i, art in enumerate(articles):
-        title = art.get("title") or ""
-        body = art.get("seendate") or ""
-        text = f"{title} {body}".strip()
-        score = analyzer.polarity_scores(text)
-
-        seen = art.get("seendate")
-        try:
-            created = pd.to_datetime(seen, utc=True)
-        except Exception:
-            created = pd.to_datetime(datetime.utcnow(), utc=True)
-
-        rows.append(
-            {
-                "id": art.get("url") or f"gdelt_{i}",
-                "created_utc": created,
-                "title": title,
-                "body": art.get("domain") or "",
-                "score": 0,
-                "num_comments": 0,
-                "compound": score["compound"],
-                "positive": score["pos"],
-                "neutral": score["neu"],
-                "negative": score["neg"],
-                "sentiment": _label_from_compound(score["compound"]),
-                "query": config.query,
-                "subreddit": "gdelt_news",
-                "url": art.get("url") or "",
-                "source": "gdelt",
-            }
-        )
-
-    df = pd.DataFrame(rows)
+    titles = [art.get("title") or "" for art in articles]
+    urls = [art.get("url") or "" for art in articles]
+    seendates = [art.get("seendate") for art in articles]
+    scores = [analyzer.polarity_scores(f"{title} {seen or ''}".strip()) for title, seen in zip(titles, seendates)]
+    score_cols = {
+        key: np.fromiter((score[key] for score in scores), dtype="float64", count=len(scores))
+        for key in ("compound", "pos", "neu", "neg")
+    }
+
+    compound = score_cols["compound"]
+    labels = np.select([compound >= 0.05, compound <= -0.05], ["positive", "negative"], default="neutral")
+
+    created = pd.to_datetime(
+        pd.Series(seendates, dtype="object"), format="%Y%m%dT%H%M%SZ", utc=True, errors="coerce"
+    )
+    created = created.fillna(pd.Timestamp.now(tz="UTC"))
+
+    df = pd.DataFrame(
+        {
+            "id": [url or f"gdelt_{i}" for i, url in enumerate(urls)],
+            "created_utc": created,
+            "title": titles,
+            "body": [art.get("domain") or "" for art in articles],
+            "score": 0,
+            "num_comments": 0,
+            "compound": compound,
+            "positive": score_cols["pos"],
+            "neutral": score_cols["neu"],
+            "negative": score_cols["neg"],
+            "sentiment": labels,
+            "query": config.query,
+            "subreddit": "gdelt_news",
+            "url": urls,
+            "source": "gdelt",
+        }
+    )
     if not df.empty:
         df["date"] = pd.to_datetime(df["created_utc"]).dt.date
         df = df.sort_values("created_utc", ascending=False)
 
     os.makedirs(os.path.dirname(config.output_path), exist_ok=True)
-    df.to_csv(config.output_path, index=False)
+    write_table(df, config.output_path)
     return df
 
 
@@ -9,9 +9,9 @@ from dataclasses import dataclass
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score
-from statsmodels.tsa.stattools import grangercausalitytests
+from scipy import stats
+
+from table_io import read_table, write_table
 
 
 @dataclass
@@ -23,27 +23,88 @@ class LagPredictionConfig:
 
 
 def _prepare(monthly_path: str, sentiment_path: str, max_lag: int) -> pd.DataFrame:
-    housing = pd.read_csv(monthly_path)
-    housing["month"] = pd.to_datetime(housing["month"])
-    housing = housing[["month", "monthly_avg_value"]].copy()
+    housing = read_table(
+        monthly_path,
+        usecols=["month", "monthly_avg_value"],
+        dtype={"monthly_avg_value": "float64"},
+    )
+    housing["month"] = pd.to_datetime(housing["month"], format="%Y-%m-%d")
 
-    sentiment = pd.read_csv(sentiment_path)
+    sentiment = read_table(
+        sentiment_path,
+        usecols=lambda c: c in {"date", "created_utc", "avg_compound"},
+        dtype={"avg_compound": "float64"},
+    )
     if "date" in sentiment.columns:
-        sentiment["date"] = pd.to_datetime(sentiment["date"])
+        sentiment["date"] = pd.to_datetime(sentiment["date"], format="%Y-%m-%d")
     else:
-        sentiment["date"] = pd.to_datetime(sentiment["created_utc"])
-
-    sentiment["month"] = sentiment["date"].dt.to_period("M").dt.to_timestamp()
-    sent_monthly = sentiment.groupby("month", as_index=False)["avg_compound"].mean()
+        sentiment["date"] = pd.to_datetime(sentiment["created_utc"], format="ISO8601", utc=True).dt.tz_localize(None)
+
+    # Months without sentiment posts are dropped.
+    sent_monthly = (
+        sentiment.set_index("date")["avg_compound"]
+        .resample("MS")
+        .mean()
+        .dropna()
+        .rename_axis("month")
+        .reset_index()
+    )
 
     data = housing.merge(sent_monthly, on="month", how="inner").sort_values("month")
-    for lag in range(1, max_lag + 1):
-        data[f"sent_lag_{lag}"] = data["avg_compound"].shift(lag)
+
+    # Build every lag from one strided window view; reversed, column j holds lag j + 1.
+    sent = data["avg_compound"].to_numpy()
+    if len(sent) > max_lag:
+        lag_matrix = np.lib.stride_tricks.sliding_window_view(sent, max_lag)[:-1, ::-1]
+    else:
+        lag_matrix = np.empty((0, max_lag))
+    lags = pd.DataFrame(lag_matrix, columns=[f"sent_lag_{lag}" for lag in range(1, max_lag + 1)])
+    data = pd.concat([data.iloc[max_lag:].reset_index(drop=True), lags], axis=1)
 
     data = data.dropna().reset_index(drop=True)
     return data
 
 
+def _fit_line(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    # Closed-form univariate OLS from centred moments; returns (intercept, slope).
+    x_mean = x.mean()
+    y_mean = y.mean()
+    dx = x - x_mean
+    sxx = float(dx @ dx)
+    slope = float(dx @ (y - y_mean)) / sxx if sxx > 0 else 0.0
+    return float(y_mean - slope * x_mean), slope
+
+
+def _lag_matrix(values: np.ndarray, max_lag: int) -> np.ndarray:
+    # Row t, column k holds values[t - k - 1]; rows before max_lag are NaN-padded.
+    padded = np.concatenate([np.full(max_lag, np.nan), values])
+    return np.lib.stride_tricks.sliding_window_view(padded, max_lag)[:-1, ::-1]
+
+
+def _granger_pvalues(y: np.ndarray, x: np.ndarray, max_lag: int) -> list[dict]:
+    # SSR F-test of "x Granger-causes y" for each lag, matching statsmodels' ssr_ftest.
+    n = len(y)
+    if n <= 3 * max_lag + 1:
+        raise ValueError("Insufficient observations for Granger causality tests.")
+
+    y_lags = _lag_matrix(y, max_lag)
+    x_lags = _lag_matrix(x, max_lag)
+    rows = []
+    for lag in range(1, max_lag + 1):
+        target = y[lag:]
+        const = np.ones((n - lag, 1))
+        restricted = np.hstack([const, y_lags[lag:, :lag]])
+        full = np.hstack([restricted, x_lags[lag:, :lag]])
+
+        ssr_r = float(np.sum((target - restricted @ np.linalg.lstsq(restricted, target, rcond=None)[0]) ** 2))
+        ssr_f = float(np.sum((target - full @ np.linalg.lstsq(full, target, rcond=None)[0]) ** 2))
+        df_resid = (n - lag) - full.shape[1]
+
+        f_stat = (ssr_r - ssr_f) / lag / (ssr_f / df_resid)
+        rows.append({"lag": lag, "ssr_ftest_pvalue": float(stats.f.sf(f_stat, lag, df_resid))})
+    return rows
+
+
 def run(config: LagPredictionConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     os.makedirs(config.output_dir, exist_ok=True)
     data = _prepare(config.monthly_series_input, config.sentiment_daily_input, config.max_lag)
@@ -52,24 +113,26 @@ def run(config: LagPredictionConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     best_lag = None
     best_r2 = -np.inf
 
+    y_all = data["monthly_avg_value"].to_numpy(dtype="float64")
     for lag in range(1, config.max_lag + 1):
-        feature = [f"sent_lag_{lag}"]
-        df = data[["month", "monthly_avg_value"] + feature].dropna().copy()
-        if len(df) < 8:
+        x_all = data[f"sent_lag_{lag}"].to_numpy(dtype="float64")
+        valid = ~(np.isnan(x_all) | np.isnan(y_all))
+        x, y = x_all[valid], y_all[valid]
+        if len(x) < 8:
             continue
 
-        split = max(4, int(len(df) * 0.8))
-        train = df.iloc[:split]
-        test = df.iloc[split:]
-        if len(test) == 0:
+        split = max(4, int(len(x) * 0.8))
+        x_test, y_test = x[split:], y[split:]
+        if len(x_test) == 0:
             continue
 
-        model = LinearRegression()
-        model.fit(train[feature], train["monthly_avg_value"])
-        pred = model.predict(test[feature])
+        intercept, slope = _fit_line(x[:split], y[:split])
+        resid = y_test - (intercept + slope * x_test)
+        ss_res = float(resid @ resid)
+        ss_tot = float(((y_test - y_test.mean()) ** 2).sum())
 
-        r2 = r2_score(test["monthly_avg_value"], pred)
-        rmse = float(mean_squared_error(test["monthly_avg_value"], pred) ** 0.5)
+        r2 = 1.0 - ss_res / ss_tot if ss_tot > 0 else np.nan
+        rmse = float(np.sqrt(ss_res / len(x_test)))
 
         lag_metrics.append({"lag": lag, "r2": float(r2), "rmse": rmse})
         if r2 > best_r2:
@@ -78,25 +141,26 @@ def run(config: LagPredictionConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
 
     lag_df = pd.DataFrame(lag_metrics)
     lag_path = os.path.join(config.output_dir, "lag_model_metrics.csv")
-    lag_df.to_csv(lag_path, index=False)
+    write_table(lag_df, lag_path)
 
     if best_lag is None:
         raise ValueError("Insufficient data for lag modeling.")
 
     granger_input = data[["monthly_avg_value", "avg_compound"]].dropna()
-    granger = grangercausalitytests(granger_input, maxlag=config.max_lag, verbose=False)
-    granger_rows = []
-    for lag, results in granger.items():
-        pval = float(results[0]["ssr_ftest"][1])
-        granger_rows.append({"lag": lag, "ssr_ftest_pvalue": pval})
+    granger_rows = _granger_pvalues(
+        granger_input["monthly_avg_value"].to_numpy(dtype="float64"),
+        granger_input["avg_compound"].to_numpy(dtype="float64"),
+        config.max_lag,
+    )
 
     granger_df = pd.DataFrame(granger_rows)
     granger_path = os.path.join(config.output_dir, "granger_results.csv")
-    granger_df.to_csv(granger_path, index=False)
+    write_table(granger_df, granger_path)
 
     best_data = data[["month", "monthly_avg_value", f"sent_lag_{best_lag}"]].dropna().copy()
-    model = LinearRegression().fit(best_data[[f"sent_lag_{best_lag}"]], best_data["monthly_avg_value"])
-    best_data["predicted"] = model.predict(best_data[[f"sent_lag_{best_lag}"]])
+    best_x = best_data[f"sent_lag_{best_lag}"].to_numpy(dtype="float64")
+    intercept, slope = _fit_line(best_x, best_data["monthly_avg_value"].to_numpy(dtype="float64"))
+    best_data["predicted"] = intercept + slope * best_x
 
     plot_path = os.path.join(config.output_dir, "lag_prediction_fit.png")
     plt.figure(figsize=(10, 5))
@@ -121,7 +185,7 @@ def run(config: LagPredictionConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
         }
     )
     summary_path = os.path.join(config.output_dir, "lag_prediction_summary.csv")
-    summary.to_csv(summary_path, index=False)
+    write_table(summary, summary_path)
 
     return lag_df, granger_df, plot_path
 
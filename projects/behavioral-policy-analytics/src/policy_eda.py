@@ -13,9 +13,12 @@ import os
 from dataclasses import dataclass
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 
+from table_io import write_table
+
 
 @dataclass
 class PolicyEDAConfig:
@@ -38,8 +41,8 @@ def prepare_data(df: pd.DataFrame, date_col: str, value_col: str, policy_date: s
         .rename(columns={value_col: "monthly_avg_value"})
     )
 
-    policy_ts = pd.to_datetime(policy_date)
-    monthly["period"] = monthly["month"].apply(lambda x: "post_policy" if x >= policy_ts else "pre_policy")
+    policy_ts = pd.to_datetime(policy_date).to_datetime64()
+    monthly["period"] = np.where(monthly["month"].to_numpy() >= policy_ts, "post_policy", "pre_policy")
     return monthly
 
 
@@ -81,15 +84,20 @@ def plot_trend(monthly: pd.DataFrame, policy_date: str, output_dir: str) -> str:
 
 
 def run(config: PolicyEDAConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
-    df = pd.read_csv(config.input_path)
+    df = pd.read_csv(
+        config.input_path,
+        usecols=[config.date_col, config.value_col],
+        dtype={config.value_col: "float64"},
+        na_values=["."],
+    )
     monthly = prepare_data(df, config.date_col, config.value_col, config.policy_date)
     summary = summarize_change(monthly)
     plot_path = plot_trend(monthly, config.policy_date, config.output_dir)
 
     monthly_path = os.path.join(config.output_dir, "monthly_series.csv")
     summary_path = os.path.join(config.output_dir, "policy_summary.csv")
-    monthly.to_csv(monthly_path, index=False)
-    summary.to_csv(summary_path, index=False)
+    write_table(monthly, monthly_path)
+    write_table(summary, summary_path)
 
     return monthly, summary, plot_path
 
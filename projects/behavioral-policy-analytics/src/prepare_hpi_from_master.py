@@ -10,43 +10,61 @@ import os
 
 import pandas as pd
 
+from table_io import write_table
+
 
 def _to_quarter_start(year: pd.Series, quarter: pd.Series) -> pd.Series:
-    p = pd.PeriodIndex(year=year.astype(int), quarter=quarter.astype(int), freq="Q")
-    return p.to_timestamp(how="start")
+    # Quarter q starts in month 3q - 2.
+    month = (quarter.astype("int8") - 1) * 3 + 1
+    return pd.to_datetime(pd.DataFrame({"year": year, "month": month, "day": 1}))
 
 
-def _extract(df: pd.DataFrame, place_id: str, out_col: str) -> pd.DataFrame:
-    part = df[(df["frequency"] == "quarterly") & (df["place_id"].astype(str) == str(place_id))].copy()
-    if part.empty:
+def _extract(by_place: dict[str, pd.DataFrame], place_id: str, out_col: str) -> pd.DataFrame:
+    part = by_place.get(str(place_id))
+    if part is None or part.empty:
         raise ValueError(f"No rows found for place_id={place_id}")
+    part = part.copy()
 
     part["DATE"] = _to_quarter_start(part["yr"], part["period"])
     part = part.sort_values("DATE")
 
     # Prefer seasonally adjusted index if available.
-    value = pd.to_numeric(part["index_sa"], errors="coerce")
-    value = value.fillna(pd.to_numeric(part["index_nsa"], errors="coerce"))
+    value = part["index_sa"].fillna(part["index_nsa"])
 
-    out = pd.DataFrame({"DATE": part["DATE"].dt.strftime("%Y-%m-%d"), out_col: value})
+    # DATE stays datetime64; to_csv writes midnight timestamps as plain YYYY-MM-DD.
+    out = pd.DataFrame({"DATE": part["DATE"], out_col: value})
     out = out.dropna().drop_duplicates(subset=["DATE"]).reset_index(drop=True)
     return out
 
 
 def run(master_path: str, la_out: str, nyc_out: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     cols = ["frequency", "place_id", "yr", "period", "index_nsa", "index_sa"]
-    df = pd.read_csv(master_path, usecols=cols)
+    # Typed at parse time; category place_id/frequency make the filters code comparisons.
+    dtypes = {
+        "frequency": "category",
+        "place_id": "category",
+        "yr": "int16",
+        "period": "int8",
+        "index_nsa": "float64",
+        "index_sa": "float64",
+    }
+    df = pd.read_csv(master_path, usecols=cols, dtype=dtypes)
 
     # Mappings based on provided master file content.
     # LA: Los Angeles-Long Beach-Glendale, CA (MSAD) -> place_id 31084
     # NYC: New York-Jersey City-White Plains, NY-NJ (MSAD) -> place_id 35614
-    la = _extract(df, place_id="31084", out_col="ATNHPIUS31080Q")
-    nyc = _extract(df, place_id="35614", out_col="ATNHPIUS35620Q")
+    # Filter the master table in one pass for both places, then split by place_id.
+    place_ids = ["31084", "35614"]
+    quarterly = df[(df["frequency"] == "quarterly") & df["place_id"].isin(place_ids)]
+    by_place = {str(key): part for key, part in quarterly.groupby("place_id", observed=True)}
+
+    la = _extract(by_place, place_id="31084", out_col="ATNHPIUS31080Q")
+    nyc = _extract(by_place, place_id="35614", out_col="ATNHPIUS35620Q")
 
     os.makedirs(os.path.dirname(la_out), exist_ok=True)
     os.makedirs(os.path.dirname(nyc_out), exist_ok=True)
-    la.to_csv(la_out, index=False)
-    nyc.to_csv(nyc_out, index=False)
+    write_table(la, la_out)
+    write_table(nyc, nyc_out)
     return la, nyc
 
 
@@ -3,25 +3,30 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
 
-from analyze_sentiment import run as run_sentiment_analysis
-from causal_impact import CausalConfig, run as run_causal
-from cross_city_compare import CompareConfig, run as run_compare
-from download_fred_series import run as run_fred_download
-from gdelt_sentiment import GDELTConfig, run as run_gdelt_sentiment
-from lagged_prediction import LagPredictionConfig, run as run_lag_prediction
-from policy_eda import PolicyEDAConfig, run as run_policy_eda
-from sentiment_pipeline import SentimentConfig, run as run_reddit_sentiment
-from topic_modeling import TopicConfig, run as run_topics
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Pipelines only save figures; pick the headless backend before any module imports pyplot.
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+# Workflow modules are imported where they are used so each subcommand only pays for its own dependencies.
 
 
 def _run_sentiment_source(source: str, query: str, limit: int, output_path: str) -> int:
     if source == "gdelt":
+        from gdelt_sentiment import GDELTConfig, run as run_gdelt_sentiment
+
         cfg = GDELTConfig(query=query, max_records=limit, output_path=output_path)
         df = run_gdelt_sentiment(cfg)
         return len(df)
 
+    from sentiment_pipeline import SentimentConfig, run as run_reddit_sentiment
+
     cfg = SentimentConfig(query=query, subreddit="all", limit=limit, output_path=output_path)
     df = run_reddit_sentiment(cfg)
     return len(df)
@@ -38,35 +43,48 @@ def _run_case(
     skip_download: bool,
     skip_sentiment: bool,
     skip_policy: bool,
-) -> None:
+) -> list[tuple[str, pd.DataFrame]]:
     raw_path = f"data/raw/{city_key}_hpi_fred.csv"
     processed_sent = f"data/processed/{city_key}_sentiment.csv"
     report_dir = f"reports/{city_key}"
+    summaries = []
 
     if not skip_download:
         if os.path.exists(raw_path):
             print(f"Using existing local HPI file for {city_key.upper()}: {raw_path}")
         else:
+            from download_fred_series import run as run_fred_download
+
             fred_df = run_fred_download(fred_series, raw_path)
             print(f"Downloaded {city_key.upper()} series rows: {len(fred_df)}")
 
     if not skip_sentiment:
+        from analyze_sentiment import run as run_sentiment_analysis
+        from table_io import parquet_path_for, read_table
+        from topic_modeling import TopicConfig, run as run_topics
+
         sent_rows = _run_sentiment_source(sentiment_source, sentiment_query, sentiment_limit, processed_sent)
         print(f"Sentiment rows ({city_key}, {sentiment_source}): {sent_rows}")
 
-        daily, _ = run_sentiment_analysis(processed_sent, report_dir)
+        # Downstream steps read the typed Parquet copies of intermediate tables; the posts are loaded once for both.
+        posts_path = parquet_path_for(processed_sent)
+        posts = read_table(posts_path)
+        daily, _ = run_sentiment_analysis(posts_path, report_dir, df=posts)
         print(f"Daily sentiment rows ({city_key}): {len(daily)}")
 
         topics_cfg = TopicConfig(
-            input_path=processed_sent,
+            input_path=posts_path,
             output_dir=f"{report_dir}/topics",
             n_topics=5,
             top_k_terms=10,
         )
-        _, evolution, _ = run_topics(topics_cfg)
+        _, evolution, _ = run_topics(topics_cfg, df=posts)
         print(f"Topic evolution rows ({city_key}): {len(evolution)}")
 
     if not skip_policy:
+        from causal_impact import CausalConfig, run as run_causal
+        from policy_eda import PolicyEDAConfig, run as run_policy_eda
+
         pol_cfg = PolicyEDAConfig(
             input_path=raw_path,
             output_dir=report_dir,
@@ -76,7 +94,7 @@ def _run_case(
         )
         monthly, summary, _ = run_policy_eda(pol_cfg)
         print(f"Policy rows ({city_key}): {len(monthly)}")
-        print(summary)
+        summaries.append((f"Policy summary ({city_key})", summary))
 
         caus_cfg = CausalConfig(
             treated_input=raw_path,
@@ -86,18 +104,34 @@ def _run_case(
             output_dir=report_dir,
         )
         _, csum, _ = run_causal(caus_cfg)
-        print(csum)
+        summaries.append((f"Causal summary ({city_key})", csum))
 
         if not skip_sentiment:
+            from lagged_prediction import LagPredictionConfig, run as run_lag_prediction
+
             lag_cfg = LagPredictionConfig(
-                monthly_series_input=f"{report_dir}/monthly_series.csv",
-                sentiment_daily_input=f"{report_dir}/sentiment_daily.csv",
+                monthly_series_input=f"{report_dir}/monthly_series.parquet",
+                sentiment_daily_input=f"{report_dir}/sentiment_daily.parquet",
                 output_dir=report_dir,
                 max_lag=6,
             )
             lag_df, _, _ = run_lag_prediction(lag_cfg)
             print(f"Lag model rows ({city_key}): {len(lag_df)}")
 
+    return summaries
+
+
+def _print_summaries(summaries: list[tuple[str, pd.DataFrame]]) -> None:
+    for label, table in summaries:
+        print(f"{label}:")
+        print(table)
+
+
+def _limit_worker_threads(threads: int) -> None:
+    # Runs before the worker imports numpy/sklearn, so their BLAS/OpenMP pools share the CPUs between cases.
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads))
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run project workflows.")
@@ -171,6 +205,8 @@ def main() -> None:
     args = parser.parse_args()
 
     if args.workflow == "download-fred":
+        from download_fred_series import run as run_fred_download
+
         df = run_fred_download(args.series_id, args.output)
         print(f"Downloaded FRED series: {len(df)} rows")
         return
@@ -181,6 +217,8 @@ def main() -> None:
         return
 
     if args.workflow == "policy":
+        from policy_eda import PolicyEDAConfig, run as run_policy_eda
+
         cfg = PolicyEDAConfig(args.input, args.output_dir, args.date_col, args.value_col, args.policy_date)
         monthly, summary, plot_path = run_policy_eda(cfg)
         print(f"Policy workflow complete: {len(monthly)} monthly points")
@@ -189,6 +227,8 @@ def main() -> None:
         return
 
     if args.workflow == "causal":
+        from causal_impact import CausalConfig, run as run_causal
+
         cfg = CausalConfig(
             treated_input=args.treated_input,
             date_col=args.date_col,
@@ -205,6 +245,8 @@ def main() -> None:
         return
 
     if args.workflow == "predict-lags":
+        from lagged_prediction import LagPredictionConfig, run as run_lag_prediction
+
         cfg = LagPredictionConfig(
             monthly_series_input=args.monthly_series_input,
             sentiment_daily_input=args.sentiment_daily_input,
@@ -218,6 +260,8 @@ def main() -> None:
         return
 
     if args.workflow == "topics":
+        from topic_modeling import TopicConfig, run as run_topics
+
         cfg = TopicConfig(
             input_path=args.input,
             output_dir=args.output_dir,
@@ -231,6 +275,8 @@ def main() -> None:
         return
 
     if args.workflow == "compare-cities":
+        from cross_city_compare import CompareConfig, run as run_compare
+
         cfg = CompareConfig(
             la_policy_summary=args.la_policy_summary,
             nyc_policy_summary=args.nyc_policy_summary,
@@ -246,7 +292,7 @@ def main() -> None:
         return
 
     if args.workflow == "la-case":
-        _run_case(
+        summaries = _run_case(
             city_key="la",
             fred_series="ATNHPIUS31080Q",
             value_col="ATNHPIUS31080Q",
@@ -258,10 +304,11 @@ def main() -> None:
             skip_sentiment=args.skip_sentiment,
             skip_policy=args.skip_policy,
         )
+        _print_summaries(summaries)
         return
 
     if args.workflow == "nyc-case":
-        _run_case(
+        summaries = _run_case(
             city_key="nyc",
             fred_series="ATNHPIUS35620Q",
             value_col="ATNHPIUS35620Q",
@@ -273,41 +320,57 @@ def main() -> None:
             skip_sentiment=args.skip_sentiment,
             skip_policy=args.skip_policy,
         )
+        _print_summaries(summaries)
         return
 
     if args.workflow == "full-platform":
-        _run_case(
-            city_key="la",
-            fred_series="ATNHPIUS31080Q",
-            value_col="ATNHPIUS31080Q",
-            policy_date="2023-04-01",
-            sentiment_query="(Measure ULA OR Los Angeles housing tax OR LA housing affordability)",
-            sentiment_limit=args.sentiment_limit,
-            sentiment_source=args.sentiment_source,
-            skip_download=False,
-            skip_sentiment=False,
-            skip_policy=False,
-        )
-        _run_case(
-            city_key="nyc",
-            fred_series="ATNHPIUS35620Q",
-            value_col="ATNHPIUS35620Q",
-            policy_date="2019-06-14",
-            sentiment_query="(HSTPA OR New York rent reform OR NYC rent stabilization)",
-            sentiment_limit=args.sentiment_limit,
-            sentiment_source=args.sentiment_source,
-            skip_download=False,
-            skip_sentiment=False,
-            skip_policy=False,
-        )
+        # LA and NYC read and write disjoint files, so run both cases in parallel processes.
+        cases = [
+            functools.partial(
+                _run_case,
+                city_key="la",
+                fred_series="ATNHPIUS31080Q",
+                value_col="ATNHPIUS31080Q",
+                policy_date="2023-04-01",
+                sentiment_query="(Measure ULA OR Los Angeles housing tax OR LA housing affordability)",
+                sentiment_limit=args.sentiment_limit,
+                sentiment_source=args.sentiment_source,
+                skip_download=False,
+                skip_sentiment=False,
+                skip_policy=False,
+            ),
+            functools.partial(
+                _run_case,
+                city_key="nyc",
+                fred_series="ATNHPIUS35620Q",
+                value_col="ATNHPIUS35620Q",
+                policy_date="2019-06-14",
+                sentiment_query="(HSTPA OR New York rent reform OR NYC rent stabilization)",
+                sentiment_limit=args.sentiment_limit,
+                sentiment_source=args.sentiment_source,
+                skip_download=False,
+                skip_sentiment=False,
+                skip_policy=False,
+            ),
+        ]
+        cpus = os.cpu_count() or 1
+        workers = min(len(cases), cpus)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_limit_worker_threads, initargs=(max(1, cpus // workers),)
+        ) as pool:
+            futures = [pool.submit(case) for case in cases]
+            for future in futures:
+                _print_summaries(future.result())
+
+        from cross_city_compare import CompareConfig, run as run_compare
 
         cfg = CompareConfig(
-            la_policy_summary="reports/la/policy_summary.csv",
-            nyc_policy_summary="reports/nyc/policy_summary.csv",
-            la_monthly_series="reports/la/monthly_series.csv",
-            nyc_monthly_series="reports/nyc/monthly_series.csv",
-            la_sentiment_file="data/processed/la_sentiment.csv",
-            nyc_sentiment_file="data/processed/nyc_sentiment.csv",
+            la_policy_summary="reports/la/policy_summary.parquet",
+            nyc_policy_summary="reports/nyc/policy_summary.parquet",
+            la_monthly_series="reports/la/monthly_series.parquet",
+            nyc_monthly_series="reports/nyc/monthly_series.parquet",
+            la_sentiment_file="data/processed/la_sentiment.parquet",
+            nyc_sentiment_file="data/processed/nyc_sentiment.parquet",
             output_dir="reports/comparison",
         )
         comp, plot_path = run_compare(cfg)
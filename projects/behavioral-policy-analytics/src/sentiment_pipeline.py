@@ -6,15 +6,36 @@ Collects posts from Reddit and labels sentiment with VADER.
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
+import operator
 import os
+import queue
+import re
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import List
+from typing import Iterator, List, TextIO
 
+import numpy as np
 import pandas as pd
 import praw
 from dotenv import load_dotenv
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from table_io import write_parquet
+from vader_scoring import get_analyzer
+
+
+LISTING_PAGE_SIZE = 100
+SCORING_BATCH = 100
+MAX_SCORED_CHARS = 4000
+SENTIMENT_LABELS = np.array(["negative", "neutral", "positive"])
+
+# Runs of one repeated symbol or emoji make VADER's emoticon handling blow up; four keep the emphasis boost.
+_SYMBOL_RUN = re.compile(r"(\W)\1{20,}")
+
+# Every field the collector keeps, pulled from a listing entry in one call.
+_POST_FIELDS = operator.itemgetter("id", "created_utc", "title", "selftext", "score", "num_comments", "url")
+_LISTING_DONE = object()
 
 
 @dataclass
@@ -25,6 +46,57 @@ class SentimentConfig:
     output_path: str
 
 
+def _load_analyzer() -> None:
+    get_analyzer()
+
+
+def _score(text: str) -> tuple[float, float, float, float]:
+    scores = get_analyzer().polarity_scores(_guard_text(text))
+    return scores["compound"], scores["pos"], scores["neu"], scores["neg"]
+
+
+def _score_batch(texts: list[str]) -> list[tuple[float, float, float, float]]:
+    return [_score(text) for text in texts]
+
+
+def _guard_text(text: str) -> str:
+    # Symbol or emoji runs mark spam: collapse them and cut the post to MAX_SCORED_CHARS. Other posts score in full.
+    guarded, runs = _SYMBOL_RUN.subn(r"\1\1\1\1", text)
+    return guarded[:MAX_SCORED_CHARS] if runs else guarded
+
+
+def _search_posts(reddit: praw.Reddit, subreddit: str, query: str, limit: int) -> Iterator[dict]:
+    # Raw listing JSON through PRAW's authenticated, rate-limited session: one request per page of posts and
+    # no lazy Submission objects whose attribute access can trigger extra fetches.
+    after = None
+    while limit > 0:
+        params = {
+            # Same search parameters Subreddit.search sends.
+            "q": query,
+            "restrict_sr": subreddit.lower() != "all",
+            "sort": "new",
+            "syntax": "lucene",
+            "t": "all",
+            "limit": min(limit, LISTING_PAGE_SIZE),
+            "after": after,
+        }
+        listing = reddit.request(method="GET", path=f"r/{subreddit}/search/", params=params)["data"]
+        posts = [child["data"] for child in listing["children"]]
+        yield from posts
+        limit -= len(posts)
+        after = listing["after"]
+        if not posts or after is None:
+            return
+
+
+def _drain_listing(listing: Iterator[dict], out: queue.Queue) -> None:
+    try:
+        for post in listing:
+            out.put(post)
+    finally:
+        out.put(_LISTING_DONE)
+
+
 class RedditSentimentCollector:
     def __init__(self) -> None:
         load_dotenv()
@@ -33,59 +105,142 @@ class RedditSentimentCollector:
             client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
             user_agent=os.getenv("REDDIT_USER_AGENT", "sentiment-research-app/0.1"),
         )
-        self.analyzer = SentimentIntensityAnalyzer()
-
-    def fetch_posts(self, subreddit: str, query: str, limit: int) -> pd.DataFrame:
-        rows: List[dict] = []
-        for submission in self.reddit.subreddit(subreddit).search(query, sort="new", limit=limit):
-            text = f"{submission.title} {submission.selftext}".strip()
-            scores = self.analyzer.polarity_scores(text)
-            label = self._label_from_compound(scores["compound"])
-            rows.append(
-                {
-                    "id": submission.id,
-                    "created_utc": datetime.fromtimestamp(submission.created_utc, tz=timezone.utc),
-                    "title": submission.title,
-                    "body": submission.selftext,
-                    "score": submission.score,
-                    "num_comments": submission.num_comments,
-                    "compound": scores["compound"],
-                    "positive": scores["pos"],
-                    "neutral": scores["neu"],
-                    "negative": scores["neg"],
-                    "sentiment": label,
-                    "query": query,
-                    "subreddit": subreddit,
-                    "url": submission.url,
-                }
-            )
-
-        df = pd.DataFrame(rows)
-        if df.empty:
+
+    def fetch_posts(self, subreddit: str, query: str, limit: int, sink: TextIO | None = None) -> pd.DataFrame:
+        batch = _empty_columns()
+        # Reposts and cross-posts repeat the same text. Each distinct text is scored once, and every post keeps
+        # a (scoring batch, position) reference to its score; str keys reuse Python's cached string hash.
+        text_refs: dict[str, tuple[int, int]] = {}
+        texts: List[str] = []
+        refs: List[tuple[int, int]] = []
+        scoring_batches: List[Future] = []
+        scored: List[list[tuple]] = []
+        pending: List[tuple[dict[str, list], List[tuple[int, int]]]] = []
+        frames: List[pd.DataFrame] = []
+
+        def submit_batch() -> None:
+            pending.append((batch, refs))
+            scoring_batches.append(scoring.submit(_score_batch, texts))
+
+        def emit_scored(wait: bool) -> None:
+            # Scored batches are appended to the sink in listing order as soon as they are ready, so a long
+            # scrape that fails part-way keeps every post scored so far.
+            while pending and (wait or scoring_batches[len(scored)].done()):
+                scored.append(scoring_batches[len(scored)].result())
+                cols, batch_refs = pending.pop(0)
+                frame = _batch_frame(cols, [scored[b][i] for b, i in batch_refs], query, subreddit)
+                if sink is not None:
+                    frame.to_csv(sink, header=not frames, index=False)
+                frames.append(frame)
+
+        # Listing pages chain through the `after` cursor and cannot be requested in parallel, so a producer
+        # thread keeps the next page request in flight while page-sized batches are scored in worker processes.
+        listing = _search_posts(self.reddit, subreddit, query, limit)
+        received: queue.Queue = queue.Queue()
+        # One scoring worker per expected page of results, up to the number of CPUs.
+        workers = max(1, min(os.cpu_count() or 1, -(-limit // SCORING_BATCH)))
+        # Forked workers inherit the analyzer loaded here.
+        _load_analyzer()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_load_analyzer) as scoring:
+            # Start the workers before the producer thread exists; forking a threaded process can deadlock.
+            scoring.submit(_load_analyzer).result()
+            with ThreadPoolExecutor(max_workers=1) as fetching:
+                producer = fetching.submit(_drain_listing, listing, received)
+                for post in iter(received.get, _LISTING_DONE):
+                    try:
+                        post_id, created_utc, title, body, score, num_comments, url = _POST_FIELDS(post)
+                    except KeyError:
+                        # Skip malformed listing entries instead of failing the whole scrape.
+                        continue
+                    batch["id"].append(post_id)
+                    batch["created_utc"].append(created_utc)
+                    batch["title"].append(title)
+                    batch["body"].append(body)
+                    batch["score"].append(score)
+                    batch["num_comments"].append(num_comments)
+                    batch["url"].append(url)
+                    text = (f"{title} {body}" if body else title).strip()
+                    ref = text_refs.get(text)
+                    if ref is None:
+                        ref = text_refs[text] = (len(scoring_batches), len(texts))
+                        texts.append(text)
+                    refs.append(ref)
+                    if len(refs) == SCORING_BATCH:
+                        submit_batch()
+                        batch, texts, refs = _empty_columns(), [], []
+                        emit_scored(wait=False)
+                # Re-raises a network or API error from the producer thread.
+                producer.result()
+            if refs:
+                submit_batch()
+            emit_scored(wait=True)
+
+        if not frames:
+            df = _batch_frame(_empty_columns(), [], query, subreddit)
+            if sink is not None:
+                df.to_csv(sink, index=False)
             return df
 
-        df["date"] = pd.to_datetime(df["created_utc"]).dt.date
-        return df.sort_values("created_utc", ascending=False)
+        df = pd.concat(frames, ignore_index=True)
+        # Newest first; ties keep listing order.
+        epoch_ns = df["created_utc"].values.view("i8")
+        return df.iloc[np.argsort(-epoch_ns, kind="stable")]
 
-    @staticmethod
-    def _label_from_compound(compound: float) -> str:
-        if compound >= 0.05:
-            return "positive"
-        if compound <= -0.05:
-            return "negative"
-        return "neutral"
 
+@functools.cache
+def get_collector() -> RedditSentimentCollector:
+    # One PRAW client per process, so back-to-back runs reuse its OAuth session instead of signing in again.
+    return RedditSentimentCollector()
 
-def run(config: SentimentConfig) -> pd.DataFrame:
-    collector = RedditSentimentCollector()
-    df = collector.fetch_posts(
-        subreddit=config.subreddit,
-        query=config.query,
-        limit=config.limit,
+
+def _empty_columns() -> dict[str, list]:
+    return {"id": [], "created_utc": [], "title": [], "body": [], "score": [], "num_comments": [], "url": []}
+
+
+def _batch_frame(cols: dict[str, list], scores: list[tuple], query: str, subreddit: str) -> pd.DataFrame:
+    compound, positive, neutral, negative = np.array(scores, dtype="float64").reshape(-1, 4).T
+    # Branch-free label codes: 0 negative, 1 neutral, 2 positive.
+    codes = (compound >= 0.05).astype(np.int8) - (compound <= -0.05).astype(np.int8) + 1
+    df = pd.DataFrame(
+        {
+            "id": cols["id"],
+            # Epoch seconds from the API, converted for the whole batch at once.
+            "created_utc": pd.to_datetime(np.asarray(cols["created_utc"], dtype="float64"), unit="s", utc=True),
+            "title": cols["title"],
+            "body": cols["body"],
+            "score": cols["score"],
+            "num_comments": cols["num_comments"],
+            "compound": compound,
+            "positive": positive,
+            "neutral": neutral,
+            "negative": negative,
+            "sentiment": pd.Categorical.from_codes(codes, categories=SENTIMENT_LABELS),
+            "query": pd.Categorical.from_codes(np.zeros(len(codes), dtype=np.int8), categories=[query]),
+            "subreddit": pd.Categorical.from_codes(np.zeros(len(codes), dtype=np.int8), categories=[subreddit]),
+            "url": cols["url"],
+        },
+        copy=False,
     )
+    if not df.empty:
+        df["date"] = df["created_utc"].values.astype("datetime64[D]")
+    return df
 
+
+def run(config: SentimentConfig) -> pd.DataFrame:
     os.makedirs(os.path.dirname(config.output_path), exist_ok=True)
-    df.to_csv(config.output_path, index=False)
+    collector = get_collector()
+    # The CSV is written batch by batch during the scrape and the Parquet copy once it is complete;
+    # a .parquet output path skips the CSV entirely.
+    parquet_only = config.output_path.endswith(".parquet")
+    sink_cm = contextlib.nullcontext() if parquet_only else open(config.output_path, "w", newline="", encoding="utf-8")
+    with sink_cm as sink:
+        df = collector.fetch_posts(
+            subreddit=config.subreddit,
+            query=config.query,
+            limit=config.limit,
+            sink=sink,
+        )
+    write_parquet(df, config.output_path)
     return df
 
 
@@ -97,7 +252,7 @@ def build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument(
         "--output",
         default="data/processed/reddit_sentiment.csv",
-        help="Output CSV path.",
+        help="Output CSV path, or a .parquet path to write Parquet only.",
     )
     return parser
 
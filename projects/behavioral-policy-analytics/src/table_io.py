@@ -0,0 +1,48 @@
+"""Shared readers and writers for pipeline artifacts.
+
+Every table is written as CSV for people and other tools, plus a zstd Parquet
+sibling that keeps dtypes and loads much faster for downstream steps and the
+dashboard.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Callable, Iterable
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+def parquet_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def write_parquet(df: pd.DataFrame, csv_path: str) -> str:
+    parquet_path = parquet_path_for(csv_path)
+    df.to_parquet(parquet_path, engine="pyarrow", compression="zstd", index=False)
+    return parquet_path
+
+
+def write_table(df: pd.DataFrame, csv_path: str) -> str:
+    df.to_csv(csv_path, index=False)
+    return write_parquet(df, csv_path)
+
+
+def read_table(
+    path: str,
+    usecols: Iterable[str] | Callable[[str], bool] | None = None,
+    dtype: dict[str, str] | None = None,
+) -> pd.DataFrame:
+    # Same usecols/dtype contract as pd.read_csv, for either a .csv or a .parquet path.
+    if not path.endswith(".parquet"):
+        return pd.read_csv(path, usecols=usecols, dtype=dtype)
+
+    columns = None
+    if usecols is not None:
+        keep = usecols if callable(usecols) else set(usecols).__contains__
+        columns = [name for name in pq.read_schema(path).names if keep(name)]
+    df = pd.read_parquet(path, columns=columns)
+    if dtype:
+        df = df.astype({col: kind for col, kind in dtype.items() if col in df.columns})
+    return df
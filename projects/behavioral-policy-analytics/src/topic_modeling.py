@@ -7,9 +7,18 @@ import os
 from dataclasses import dataclass
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from sklearn.decomposition import LatentDirichletAllocation
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+
+from table_io import read_table, write_table
+
+N_HASH_FEATURES = 2**18
+MAX_FEATURES = 2500
+MIN_DF = 2
+VOCAB_SAMPLE_DOCS = 2000
+INPUT_DTYPES = {"title": "string[pyarrow]", "body": "string[pyarrow]"}
 
 
 @dataclass
@@ -21,52 +30,97 @@ class TopicConfig:
 
 
 def _clean_text(df: pd.DataFrame) -> pd.Series:
-    title = df.get("title", pd.Series([""] * len(df)))
-    body = df.get("body", pd.Series([""] * len(df)))
-    text = (title.fillna("") + " " + body.fillna("")).str.strip()
-    return text
+    empty = pd.Series("", index=df.index, dtype="string[pyarrow]")
+    title = df.get("title", empty).fillna("")
+    body = df.get("body", empty).fillna("")
+    return title.str.cat(body, sep=" ").str.strip()
+
+
+def _bucket_terms(text: pd.Series, hasher: HashingVectorizer) -> dict[int, str]:
+    # Name hashed columns by re-hashing a sampled vocabulary; on collisions the most frequent term wins.
+    sample = text if len(text) <= VOCAB_SAMPLE_DOCS else text.sample(n=VOCAB_SAMPLE_DOCS, random_state=42)
+    counter = CountVectorizer(stop_words="english")
+    counts = counter.fit_transform(sample)
+    terms = counter.get_feature_names_out()
+    doc_freq = np.asarray((counts > 0).sum(axis=0)).ravel()
+    order = np.argsort(doc_freq, kind="stable")
+    buckets = hasher.transform(terms[order]).indices
+    return dict(zip(buckets.tolist(), terms[order].tolist()))
 
 
-def run(config: TopicConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
+def run(config: TopicConfig, df: pd.DataFrame | None = None) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     os.makedirs(config.output_dir, exist_ok=True)
 
-    df = pd.read_csv(config.input_path)
+    wanted = {"title", "body", "created_utc"}
+    if df is None:
+        df = read_table(config.input_path, usecols=wanted.__contains__, dtype=INPUT_DTYPES)
+    else:
+        df = df[[c for c in df.columns if c in wanted]]
+        df = df.astype({c: kind for c, kind in INPUT_DTYPES.items() if c in df.columns})
     if df.empty:
         raise ValueError("Topic modeling input is empty.")
 
+    # Posts without a title or body carry no tokens; leave them out of vectorizing and the monthly averages.
     text = _clean_text(df)
-    vectorizer = CountVectorizer(stop_words="english", max_features=2500, min_df=2)
-    X = vectorizer.fit_transform(text)
-
-    lda = LatentDirichletAllocation(n_components=config.n_topics, random_state=42)
+    has_text = (text.str.len() > 0).to_numpy(dtype=bool)
+    if not has_text.any():
+        raise ValueError("Topic modeling input has no text.")
+    text = text[has_text]
+    hasher = HashingVectorizer(n_features=N_HASH_FEATURES, alternate_sign=False, norm=None, stop_words="english")
+    X = hasher.transform(text).tocsc()
+
+    # Same pruning CountVectorizer applied: drop rare columns, keep the most frequent MAX_FEATURES.
+    doc_freq = np.diff(X.indptr)
+    keep = np.flatnonzero(doc_freq >= MIN_DF)
+    if len(keep) > MAX_FEATURES:
+        term_freq = np.asarray(X[:, keep].sum(axis=0)).ravel()
+        keep = np.sort(keep[np.argsort(-term_freq, kind="stable")[:MAX_FEATURES]])
+    X = X[:, keep].tocsr()
+
+    # Online variational Bayes on mini-batches, with the E-step spread across cores.
+    lda = LatentDirichletAllocation(
+        n_components=config.n_topics,
+        learning_method="online",
+        batch_size=1024,
+        max_iter=10,
+        n_jobs=-1,
+        random_state=42,
+    )
     doc_topics = lda.fit_transform(X)
 
-    terms = vectorizer.get_feature_names_out()
-    topic_rows = []
-    for i, comp in enumerate(lda.components_):
-        idx = comp.argsort()[::-1][: config.top_k_terms]
-        topic_rows.append(
-            {
-                "topic": i,
-                "top_terms": ", ".join(terms[j] for j in idx),
-            }
-        )
-
-    topic_keywords = pd.DataFrame(topic_rows)
+    bucket_terms = _bucket_terms(text, hasher)
+    terms = np.array([bucket_terms.get(bucket, f"<hash {bucket}>") for bucket in keep.tolist()])
+    # Partial selection of the k heaviest terms for every topic at once, then order just those.
+    k = min(config.top_k_terms, len(terms))
+    neg = -lda.components_
+    part = np.argpartition(neg, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(part, np.argsort(np.take_along_axis(neg, part, axis=1), axis=1), axis=1)
+    topic_keywords = pd.DataFrame(
+        {
+            "topic": np.arange(config.n_topics),
+            "top_terms": [", ".join(row) for row in terms[order].tolist()],
+        }
+    )
     topic_keywords_path = os.path.join(config.output_dir, "topic_keywords.csv")
-    topic_keywords.to_csv(topic_keywords_path, index=False)
+    write_table(topic_keywords, topic_keywords_path)
 
     if "created_utc" in df.columns:
-        dt = pd.to_datetime(df["created_utc"])
+        dt = pd.to_datetime(df["created_utc"], format="ISO8601", utc=True).dt.tz_localize(None)
     else:
         dt = pd.Timestamp.today().normalize() + pd.to_timedelta(range(len(df)), unit="D")
 
-    topic_assign = pd.DataFrame(doc_topics, columns=[f"topic_{i}" for i in range(config.n_topics)])
-    topic_assign["month"] = pd.to_datetime(dt).to_period("M").to_timestamp()
-    topic_evolution = topic_assign.groupby("month", as_index=False).mean()
+    # Monthly mean of document-topic weights as a scatter-add over month codes (NaT months are skipped).
+    month = dt.to_numpy()[has_text].astype("datetime64[M]").astype("datetime64[ns]")
+    codes, months = pd.factorize(month, sort=True)
+    valid = codes >= 0
+    sums = np.zeros((len(months), config.n_topics))
+    np.add.at(sums, codes[valid], doc_topics[valid])
+    counts = np.bincount(codes[valid], minlength=len(months))
+    topic_evolution = pd.DataFrame(sums / counts[:, None], columns=[f"topic_{i}" for i in range(config.n_topics)])
+    topic_evolution.insert(0, "month", months)
 
     evolution_path = os.path.join(config.output_dir, "topic_evolution.csv")
-    topic_evolution.to_csv(evolution_path, index=False)
+    write_table(topic_evolution, evolution_path)
 
     plot_path = os.path.join(config.output_dir, "topic_evolution.png")
     plt.figure(figsize=(11, 5))
@@ -77,7 +131,7 @@ def run(config: TopicConfig) -> tuple[pd.DataFrame, pd.DataFrame, str]:
     plt.ylabel("Average Topic Weight")
     plt.legend(ncol=2, fontsize=8)
     plt.tight_layout()
-    plt.savefig(plot_path, dpi=200)
+    plt.savefig(plot_path, dpi=120)
     plt.close()
 
     return topic_keywords, topic_evolution, plot_path
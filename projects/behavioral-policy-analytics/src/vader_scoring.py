@@ -0,0 +1,13 @@
+"""Shared VADER sentiment analyzer for the scoring pipelines."""
+
+from __future__ import annotations
+
+import functools
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+
+@functools.cache
+def get_analyzer() -> SentimentIntensityAnalyzer:
+    # Loading the VADER lexicon is the expensive part; do it once per process.
+    return SentimentIntensityAnalyzer()